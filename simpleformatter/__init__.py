@@ -38,7 +38,7 @@ __author__ = """Ricky L Teachey Jr"""
 __email__ = 'ricky@teachey.org'
 __version__ = '0.1.0'
 
-from .simpleformatter import SimpleFormatter, formatmethod
+from .simpleformatter import SimpleFormatter, formatmethod, clear_caches, format_many
 
 simpleformatter = SimpleFormatter()
 formattable = simpleformatter.formattable
@@ -1,12 +1,19 @@
-from inspect import signature
+import sys
 from itertools import repeat
-from typing import Optional, NewType, Callable, Dict, Mapping, TypeVar, Type, Union, Sequence, Any, Iterable, Tuple
+from types import FunctionType, MappingProxyType
+from weakref import WeakKeyDictionary
+from typing import (Optional, NewType, Callable, Dict, Mapping, MutableMapping, TypeVar, Type, Union, Sequence, Any,
+                    Iterable, Tuple, List, cast)
 
-Sentinel = type("Sentinel", (), {})
-SENTINEL = Sentinel()
+SENTINEL: Any = object()  # marks an omitted argument
 FORMATTERS = "_formatters"  # attr name to keep reference to applied simpleformatter instances
 DEFAULT__FORMAT__ = "_default__format__"  # attr name to keep reference to original __format__
 SPECS = "specifiers"  # formatmethod specifiers holder attribute name
+EMPTY_REGISTRY = MappingProxyType(dict())  # shared stand-in for a missing registry
+
+# code object flags (same values as inspect.CO_VARARGS and inspect.CO_VARKEYWORDS; inspect is only imported if needed)
+CO_VARARGS = 0x04
+CO_VARKEYWORDS = 0x08
 
 # repeated error messages
 SPECS_TYPE_ERROR = "format specifiers must be {type_name!s}, not {obj.__class__.__qualname__!s}"
@@ -21,6 +28,17 @@ TargetDecorator = Callable[[Target], Target]
 Registry = Mapping[FormatSpec, Target]
 FormatDict = Dict[FormatSpec, Target]
 
+# target parameter counts, computed once per target (see target_arity); weak so discarded targets aren't kept alive
+_ARITY_CACHE: MutableMapping[Target, int] = WeakKeyDictionary()
+# combined SimpleFormatter registries per formattable class (see composite_registry); cleared on every registration
+# weak so formatted classes, such as throwaway subclasses, aren't kept alive
+_COMPOSITE_CACHE: MutableMapping[Type, FormatDict] = WeakKeyDictionary()
+# formatmethods per format specifier for each formattable class (see formatmethod_index); cleared on registration
+_FORMATMETHOD_CACHE: MutableMapping[Type, Dict[FormatSpec, Any]] = WeakKeyDictionary()
+# adapted formatting functions per format specifier for each formatted class (see lookup_formatting_func); cleared on
+# registration
+_LOOKUP_CACHE: MutableMapping[Type, Dict[FormatSpec, Callable[[Any, FormatSpec], FormatString]]] = WeakKeyDictionary()
+
 
 class SimpleFormatterError(Exception):
     pass
@@ -29,101 +47,269 @@ class SimpleFormatterError(Exception):
 def _new__format__(self: Any, format_spec: FormatSpec) -> FormatString:
     """Replacement __format__ formatmethod for formattable decorated classes"""
 
-    if not isinstance(format_spec, str):
+    # exact str is checked first; it skips the isinstance machinery for the common case
+    if type(format_spec) is not str and not isinstance(format_spec, str):
         raise TypeError(f"__format__() argument must be str, not {type(format_spec).__qualname__!s}")
 
-    target: Target
-    try:
-        target = compute_formatting_func(self, format_spec)
-    except SimpleFormatterError:
-        try:
-            target = getattr(type(self), DEFAULT__FORMAT__)
-        except AttributeError:
-            raise ValueError("invalid format specifier")
-        else:
-            return target(self, format_spec)
+    return lookup_formatting_func(type(self), format_spec)(self, format_spec)
+
+
+def lookup_formatting_func(cls: Type, format_spec: FormatSpec) -> Callable[[Any, FormatSpec], FormatString]:
+    """Retrieve the formatting function for cls instances and the format specifier, adapted to take both arguments.
+
+    Results are cached per cls and format specifier until the next registration (see clear_caches).
+    """
+
+    formatting_func = _LOOKUP_CACHE.get(cls, EMPTY_REGISTRY).get(format_spec)
+    if formatting_func is None:
+        formatting_func = resolve_formatting_func(cls, format_spec)
+        _LOOKUP_CACHE.setdefault(cls, dict())[format_spec] = formatting_func
+    return formatting_func
+
+
+def resolve_formatting_func(cls: Type, format_spec: FormatSpec) -> Callable[[Any, FormatSpec], FormatString]:
+    """Compute the formatting function for cls instances and the format specifier, adapted to take both arguments.
+
+    Falls back on the original cls.__format__ if the format specifier is unhandled.
+    """
+
+    target: Optional[Target] = compute_cls_formatting_func(cls, format_spec, None)
+    if target is not None:
+        return adapt_target(target)
+
+    # the original __format__ always takes both arguments
+    default__format__ = getattr(cls, DEFAULT__FORMAT__, None)
+    if default__format__ is None:
+        raise ValueError("invalid format specifier")
+    return default__format__
+
+
+def adapt_target(target: Target) -> Callable[[Any, FormatSpec], FormatString]:
+    """Wrap the target so it can always be called with both the object and the format specifier."""
 
     # user defined targets *may* discard arguments for convenience
     # TODO: figure out if want to allow discarding self and keeping format_spec? how to do? check staticmethod??
-    if len(signature(target).parameters) == 0:
-        return target()
-    if len(signature(target).parameters) == 1:
-        return target(self)
-    return target(self, format_spec)
+    arity = target_arity(target)
+    if arity == 0:
+        return lambda obj, format_spec: target()
+    if arity == 1:
+        return lambda obj, format_spec: target(obj)
+    return target
 
 
-def compute_formatting_func(obj: Any, format_spec: FormatSpec) -> Target:
-    """Uses the SimpleFormatters and formatmethods associated with obj to compute a formatting function.
+def format_many(objs: Iterable[Any], format_spec: FormatSpec = "") -> List[FormatString]:
+    """Format each object with the same format specifier, equivalent to [format(obj, format_spec) for obj in objs].
 
-    Raises SimpleFormatterError if obj has no associated SimpleFormatter for that format specifier.
+    The formatting function is looked up once per run of same-typed objects instead of once per object.
+
+    >>> from simpleformatter import formattable, formatmethod
+    >>> @formattable
+    ... class C:
+    ...     @formatmethod("spec")
+    ...     def my_formatter(self):
+    ...         return "Formatted C object"
+    ...
+    >>> format_many([C(), C()], "spec")
+    ['Formatted C object', 'Formatted C object']
+    """
+
+    if type(format_spec) is not str and not isinstance(format_spec, str):
+        raise TypeError(f"format() argument 2 must be str, not {type(format_spec).__qualname__!s}")
+
+    results: List[FormatString] = list()
+    cls: Optional[Type] = None
+    formatting_func: Callable[[Any, FormatSpec], FormatString]
+    for obj in objs:
+        if type(obj) is not cls:
+            cls = type(obj)
+            if cls.__format__ is _new__format__:
+                formatting_func = lookup_formatting_func(cls, format_spec)
+            else:
+                # not formattable; use its own __format__
+                formatting_func = cls.__format__
+        result = formatting_func(obj, format_spec)
+        # format() rejects a non-str result, so format_many does as well
+        if type(result) is not str and not isinstance(result, str):
+            raise TypeError(f"__format__ must return a str, not {type(result).__qualname__!s}")
+        results.append(result)
+
+    return results
+
+
+def clear_caches() -> None:
+    """Discard all of the computed lookups.
+
+    Registering with a SimpleFormatter does this automatically; call it after changing a formattable class or a
+    registry some other way (such as adding a formatmethod to a class after it is defined).
+    """
+
+    _COMPOSITE_CACHE.clear()
+    _FORMATMETHOD_CACHE.clear()
+    _LOOKUP_CACHE.clear()
+
+
+def target_arity(target: Target) -> int:
+    """The number of parameters accepted by the target formatting function.
+
+    The result is cached per target so the formatting hot path doesn't repeat the introspection.
     """
 
-    # get any formatmethod first and check if it is set to override
-    format_method: Optional[formatmethod]
     try:
-        format_method = lookup_formatmethod(obj, format_spec)
-    except SimpleFormatterError:
-        format_method = None
+        return _ARITY_CACHE[target]
+    except (KeyError, TypeError):
+        # TypeError: target can't be weakly referenced, so it isn't cached
+        pass
+
+    arity: int
+    if type(target) is FunctionType and not hasattr(target, "__wrapped__"):
+        # plain python function: read the parameter count straight off the code object
+        code = target.__code__
+        arity = code.co_argcount + code.co_kwonlyargcount + bool(code.co_flags & CO_VARARGS) + \
+                bool(code.co_flags & CO_VARKEYWORDS)
     else:
+        # C functions, partials, wrapped functions, other callables
+        from inspect import signature
+        arity = len(signature(target).parameters)
+
+    try:
+        _ARITY_CACHE[target] = arity
+    except TypeError:
+        pass
+    return arity
+
+
+def compute_formatting_func(obj: Any, format_spec: FormatSpec, default: Any = SENTINEL) -> Target:
+    """Uses the SimpleFormatters and formatmethods associated with obj to compute a formatting function.
+
+    Raises SimpleFormatterError if obj has no associated SimpleFormatter for that format specifier, unless a default
+    is given, in which case the default is returned instead.
+    """
+
+    return compute_cls_formatting_func(type(obj), format_spec, default)
+
+
+def compute_cls_formatting_func(cls: Type, format_spec: FormatSpec, default: Any = SENTINEL) -> Target:
+    """compute_formatting_func for instances of cls; the formatting function only depends on the class."""
+
+    # get any formatmethod first and check if it is set to override
+    format_method: Optional[formatmethod] = formatmethod_index(cls).get(format_spec)
+    if format_method is not None and format_method.override:
         # formatmethod with override comes first
-        if format_method.override:
-            return format_method.__func__
+        return format_method.__func__
 
     # the specifier target is next priority
-    try:
-        return compute_target(obj, format_spec)
-    except SimpleFormatterError as e:
-        if format_method is None:
-            raise e
-        else:
-            # formatmethod with no override comes last
-            return format_method.__func__
+    target: Optional[Target] = composite_registry(cls).get(format_spec)
+    if target is not None:
+        return target
+
+    if format_method is not None:
+        # formatmethod with no override comes last
+        return format_method.__func__
+
+    if default is not SENTINEL:
+        return default
 
+    # signal spec handling failure
+    raise SimpleFormatterError(f"unhandled format_spec: {format_spec!r}")
 
-def compute_target(obj: Any, format_spec: FormatSpec) -> Target:
+
+def compute_target(obj: Any, format_spec: FormatSpec, default: Any = SENTINEL) -> Target:
     """Retrieve the target formatting function given an object and format specifier.
 
-    The SimpleFormatters associated with obj are combined to find the target.
+    The SimpleFormatters associated with obj are combined to find the target. Raises SimpleFormatterError if there is
+    no target for the format specifier, unless a default is given, in which case the default is returned instead.
     """
 
-    cls = type(obj)
-    empty_dict = dict()
+    target = composite_registry(type(obj)).get(format_spec, default)
+    if target is SENTINEL:
+        # signal spec handling failure
+        raise SimpleFormatterError(f"unhandled format_spec: {format_spec!r}")
+    return target
+
+
+def composite_registry(cls: Type) -> FormatDict:
+    """The combined registry of the SimpleFormatters associated with cls.
+
+    The composite registry only changes on registration, so it is built once per class and reused.
+    """
+
+    try:
+        return _COMPOSITE_CACHE[cls]
+    except KeyError:
+        composite_reg = _COMPOSITE_CACHE[cls] = compute_composite_registry(cls)
+        return composite_reg
+
+
+def compute_composite_registry(cls: Type) -> FormatDict:
+    """Combine the registries of the SimpleFormatters associated with cls into a single flat registry.
+
+    The SimpleFormatters of cls and of its parent classes are all associated with cls; those of the parents come first.
+    Specifiers given to the formattable decorator take priority over those given to target decorators.
+    """
 
     # build composite registries from formatters
     composite_cls_reg: FormatDict = dict()
     composite_target_reg: FormatDict = dict()
 
     fmtr: SimpleFormatter
-    for fmtr in getattr(obj, FORMATTERS):
-        composite_cls_reg.update(fmtr.cls_reg.get(cls, empty_dict))
-        composite_target_reg.update(fmtr.target_reg)
+    for cls_obj in reversed(cls.__mro__):
+        for fmtr in vars(cls_obj).get(FORMATTERS, ()):
+            composite_cls_reg.update(fmtr.cls_reg.get(cls, EMPTY_REGISTRY))
+            composite_target_reg.update(fmtr.target_reg)
 
-    try:
-        # formattable decorator first
-        return composite_cls_reg[format_spec]
-    except KeyError:
-        try:
-            # target decorators second
-            return composite_target_reg[format_spec]
-        except KeyError:
-            # signal spec handling failure
-            raise SimpleFormatterError(f"unhandled format_spec: {format_spec!r}")
+    # formattable decorator first, target decorators second
+    composite_target_reg.update(composite_cls_reg)
+    return composite_target_reg
 
 
-def lookup_formatmethod(obj: Any, format_spec: FormatSpec) -> 'formatmethod':
+def lookup_formatmethod(obj: Any, format_spec: FormatSpec, default: Any = SENTINEL) -> 'formatmethod':
     """Retrieve the obj formatmethod that utilizes the format_spec, if it exists.
 
-    Raises SimpleFormatterError if one is not found.
+    Raises SimpleFormatterError if one is not found, unless a default is given, in which case the default is returned
+    instead.
     """
 
-    try:
-        cls = type(obj)
-        # perform lookup based on the cls's formatmethod-like objects (ie, objects with a SPECS attribute)
-        # the MOST RECENTLY DEFINED method using the format_spec is the one we want
-        return next(cls_member for cls_member in (getattr(cls, attr, None) for attr in reversed(dir(obj)))
-                      if format_spec in getattr(cls_member, SPECS, ()))
-    except StopIteration:
+    format_method = formatmethod_index(type(obj)).get(format_spec, default)
+    if format_method is SENTINEL:
         raise SimpleFormatterError()
+    return format_method
+
+
+def formatmethod_index(cls: Type) -> Dict[FormatSpec, 'formatmethod']:
+    """The format specifier to formatmethod mapping for cls.
+
+    The index is built once per class and reused.
+    """
+
+    try:
+        return _FORMATMETHOD_CACHE[cls]
+    except KeyError:
+        index = _FORMATMETHOD_CACHE[cls] = compute_formatmethod_index(cls)
+        return index
+
+
+def compute_formatmethod_index(cls: Type) -> Dict[FormatSpec, 'formatmethod']:
+    """Map each format specifier to the cls formatmethod that utilizes it.
+
+    The MOST RECENTLY DEFINED method using a format_spec is the one it maps to; methods defined on a subclass are
+    more recent than those of its parents.
+    """
+
+    # collect the class members in definition order, walking from the most basic class to cls
+    # (object is last in every mro and never holds formatmethods, so it is skipped)
+    members: Dict[str, Any] = dict()
+    for cls_obj in reversed(cls.__mro__[:-1]):
+        for attr, cls_member in vars(cls_obj).items():
+            # a redefined member moves to the end (ie, it is the most recent)
+            members.pop(attr, None)
+            members[attr] = cls_member
+
+    # index the cls's formatmethod-like objects (ie, objects with a SPECS attribute)
+    index: Dict[FormatSpec, formatmethod] = dict()
+    for cls_member in members.values():
+        index.update(dict.fromkeys(getattr(cls_member, SPECS, ()), cls_member))
+
+    return index
 
 
 class formatmethod:
@@ -146,11 +332,15 @@ class formatmethod:
     'Formatted C object spec'
     """
 
+    __slots__ = ("override", "__func__", "specifiers")  # specifiers: see SPECS
+
+    specifiers: Tuple[FormatSpec, ...]
+
     def __init__(self, *specs: Union[Target, FormatSpec], override: bool = False) -> None:
 
         self.override: bool = override
 
-        method: Union[Sentinel, Target] = SENTINEL
+        method: Any = SENTINEL
 
         # first specifier may be decorator argument
         if specs and not isinstance(specs[0], str):
@@ -161,7 +351,7 @@ class formatmethod:
         check_types(specs, str, SPECS_TYPE_ERROR)
 
         # associate specs with this formatmethod, and guard against double decorators, no specs == empty string spec
-        setattr(self, SPECS, set(specs) if specs else {"",})
+        self.specifiers = tuple(dict.fromkeys(map(intern_spec, specs))) if specs else ("",)
 
         # apply decorator if called with no arguments
         if method is not SENTINEL:
@@ -174,16 +364,12 @@ class formatmethod:
 
     def __call__(self, method: Target) -> 'formatmethod':
         check_types(method, Callable, TARGET_TYPE_ERROR)
-        getattr(self, SPECS).update(getattr(method, SPECS, set()))
-        self._method = getattr(method, "__func__", method)
+        # specifiers of an inner formatmethod are merged in (duplicates dropped)
+        self.specifiers = tuple(dict.fromkeys((*self.specifiers, *getattr(method, SPECS, ()))))
+        # the formatting method decorated by formatmethod
+        self.__func__: Target = getattr(method, "__func__", method)
         return self
 
-    @property
-    def __func__(self) -> Target:
-        """The formatting method decorated by formatmethod"""
-
-        return self._method
-
     def __str__(self):
         return f"{type(self).__qualname__}({self.__func__.__name__})"
 
@@ -202,12 +388,15 @@ class SimpleFormatter:
     >>> from simpleformatter import target  # decorator for formatting functions
     """
 
-    target_reg: FormatDict
-    cls_reg: Dict[Type, FormatDict]
+    # plain dicts until frozen, read-only views afterwards (see freeze)
+    target_reg: Union[FormatDict, Registry]
+    cls_reg: Union[Dict[Type, FormatDict], Mapping[Type, Registry]]
+    frozen: bool
 
     def __init__(self) -> None:
         self.target_reg = dict()
         self.cls_reg = dict()
+        self.frozen = False
 
     def formattable(self, cls: Optional[T_Type] = None, **kwargs: Target) -> Union[T_Type, Callable[[T_Type], T_Type]]:
         """formattable decorator, applied to classes. Decorated class is registered with the SimpleFormatter, and
@@ -258,7 +447,7 @@ class SimpleFormatter:
         'my_formatter2 formatted the object with spec'
         """
 
-        func: Union[Sentinel, Target] = SENTINEL
+        func: Any = SENTINEL
 
         if specs and not isinstance(specs[0], str):
             specs: Sequence[FormatSpec]
@@ -270,36 +459,88 @@ class SimpleFormatter:
 
         return target_dec if func is SENTINEL else target_dec(func)
 
+    def freeze(self) -> None:
+        """Make the registries read-only once all formatting is set up.
+
+        Classes and targets can no longer be registered with a frozen SimpleFormatter.
+        """
+
+        self.target_reg = MappingProxyType(dict(self.target_reg))
+        self.cls_reg = MappingProxyType({cls: MappingProxyType(dict(reg)) for cls, reg in self.cls_reg.items()})
+        self.frozen = True
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """The registries are copied and pickled as plain dicts (the read-only views of a frozen SimpleFormatter can't
+        be); see __setstate__."""
+
+        state = vars(self).copy()
+        state.update(target_reg=dict(self.target_reg), cls_reg={cls: dict(reg) for cls, reg in self.cls_reg.items()})
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """A copy of a frozen SimpleFormatter is frozen too."""
+
+        vars(self).update(state)
+        if self.frozen:
+            self.freeze()
+
+    def check_not_frozen(self) -> None:
+        """Raises SimpleFormatterError if the SimpleFormatter has been frozen."""
+
+        if self.frozen:
+            raise SimpleFormatterError("cannot register with a frozen SimpleFormatter")
+
     def register_cls(self, cls: Type, reg: Registry) -> None:
         """Associate the cls with the SimpleFormatter instance for formatting."""
 
-        # if not previously done for this class, override the __format__ method, keep a reference to the old one
-        setattr(cls, DEFAULT__FORMAT__, getattr(cls, DEFAULT__FORMAT__, cls.__format__))
-        cls.__format__ = _new__format__
+        self.check_not_frozen()
 
-        # add the SimpleFormatter to the SF list (create the list if this is the first one)
-        try:
-            formatters = getattr(cls, FORMATTERS)
-        except AttributeError:
-            setattr(cls, FORMATTERS, [self])
-        else:
-            formatters.append(self)
+        # if not previously done for this class (or inherited), override the __format__ method, keep a reference to
+        # the old one; an inherited original __format__ takes precedence over one defined by a decorated subclass
+        if cls.__format__ is not _new__format__:
+            setattr(cls, DEFAULT__FORMAT__, getattr(cls, DEFAULT__FORMAT__, cls.__format__))
+            cls.__format__ = _new__format__
+
+        # add the SimpleFormatter to the SF tuple in the class's own namespace; inherited SFs are collected along the
+        # mro when formatting (see compute_composite_registry), so a parent's tuple is never copied or modified
+        setattr(cls, FORMATTERS, (*vars(cls).get(FORMATTERS, ()), self))
+
+        reg = {intern_spec(spec): target for spec, target in reg.items()}
+
+        # not frozen, so the registries are still plain dicts
+        cls_reg = cast(Dict[Type, FormatDict], self.cls_reg)
 
         # update the cls registry with reg, or use reg as the new registry if cls registry doesn't exist
         try:
-            self.cls_reg[cls].update(reg)
+            cls_reg[cls].update(reg)
         except KeyError:
-            self.cls_reg[cls] = reg
+            cls_reg[cls] = reg
+
+        clear_caches()
 
     def register_target(self, target: Target, specs: Union[FormatSpec, Iterable[FormatSpec]]) -> None:
         """Associate the target formatting function with the SimpleFormatter instance for formatting."""
 
+        self.check_not_frozen()
+
         specs_tup: Tuple[FormatSpec] = (specs,) if isinstance(specs, str) else tuple(specs)
         check_types(specs_tup, str, SPECS_TYPE_ERROR)
         check_types(target, Callable, TARGET_TYPE_ERROR)
+        specs_tup = tuple(map(intern_spec, specs_tup))
+
+        # update the target registry (not frozen, so still a plain dict) with the specifiers
+        cast(FormatDict, self.target_reg).update(dict.fromkeys(specs_tup, target))
 
-        # update the target registry with the specifiers
-        self.target_reg.update(zip(specs_tup, repeat(target)))
+        clear_caches()
+
+
+def intern_spec(spec: FormatSpec) -> FormatSpec:
+    """Intern a registered format specifier so registry lookups can match on identity.
+
+    Specifiers that are str subclasses can't be interned and are returned unchanged.
+    """
+
+    return sys.intern(spec) if type(spec) is str else spec
 
 
 def check_types(objs: Any, types: Union[Type, Iterable[Type]], err_msgs: Union[str, Iterable[str]]) -> None:
@@ -321,7 +562,5 @@ def check_types(objs: Any, types: Union[Type, Iterable[Type]], err_msgs: Union[s
         err_msgs = repeat(err_msgs)
 
     for obj, type_, msg in zip(objs, types, err_msgs):
-        try:
-            assert isinstance(obj, type_)
-        except AssertionError:
+        if not isinstance(obj, type_):
             raise TypeError(msg.format(obj=obj, type_=type_, type_name=getattr(type_, '__qualname__', str(type_))))
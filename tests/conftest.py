@@ -12,6 +12,7 @@ global_simpleformatter = simpleformatter.simpleformatter
 
 @pytest.fixture
 def sf_copy():
+    """A fresh copy of the global simpleformatter for each test, so registrations never leak between tests"""
     return deepcopy(global_simpleformatter)
 
 
@@ -20,7 +21,18 @@ def formattable(sf_copy):
     return sf_copy.formattable
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def sf_module():
+    """A copy shared by the module scoped fixtures of one test module"""
+    return deepcopy(global_simpleformatter)
+
+
+@pytest.fixture(scope="module")
+def module_formattable(sf_module):
+    return sf_module.formattable
+
+
+@pytest.fixture(scope="session")
 def formatmethod():
     return simpleformatter.formatmethod
 
@@ -3,39 +3,69 @@
 
 """Tests for `simpleformatter.formattable` and `simpleformatter.formatmethod` decorator usage."""
 
-from collections import defaultdict
+from operator import attrgetter
+from types import MappingProxyType
+
 import pytest
+from simpleformatter import clear_caches
 
 empty_str = ""  # for readability
 
 # example api implementation fixtures ##################################################################################
 #
-# NOTE: each example class fixture has its own test_results dictionary (defaultdict) that contains the expected test
-# results for a given format_spec, e.g.:
+# NOTE: each example class fixture has a *_RESULTS table (defined below) that contains the expected test results for a
+# given format_spec, e.g.:
 #
 #                                spec      expected result
 #                                -----     ---------------
-#                   test_results["foo"] = "fooed result"
-#                   test_results["bar"] = "barred result"
+#                   A_RESULTS = {"foo": "fooed result",
+#                                "bar": "barred result"}
 #
-# The dictionary returns None for a format_spec that isn't expected; when a format_spec isn't expected, behavior falls
-# back on default/parent behavior upon application of the formatter target (such as format, an f-string, a Formatter,
-# or string.format). If fallback behavior raises an exception, the exception will raise *FROM* a SimpleFormatterError.
-
-
-@pytest.fixture
-def A(formattable, formatmethod):
-    @formattable
+# The parametrize cases of the tests below take their expected result column from these tables. A format_spec that
+# isn't expected has no entry; its case expects None (formatter only needs to run) or the exception raised by the
+# fallback on default/parent behavior upon application of the formatter target (such as format, an f-string, a
+# Formatter, or string.format). An exception raised by the fallback behavior propagates unchanged.
+
+A_RESULTS = MappingProxyType({
+    # my_formatter expected results
+    empty_str: "class A object formatted",  # no spec argument equivalent to empty_str
+})
+
+B_RESULTS = MappingProxyType({
+    # specialx_formatter expected results
+    empty_str: "class B object spec = ''",
+    "specialx": "class B object spec = 'specialx'",
+    # specialyz_formatter expected results
+    "specialy": "class B object spec = 'specialyz'",
+    "specialz": "class B object spec = 'specialyz'",
+})
+
+C_RESULTS = MappingProxyType({
+    # parent formatter is == object.__format__ target (~equivalent to format() built-in)
+    empty_str: "class C object",
+    # special_formatter expected results
+    "specialx": "class C object spec = 'specialx'",
+    "specialy": "class C object spec = 'specialy'",
+    "specialz": "class C object spec = 'specialz'",
+})
+
+D_RESULTS = MappingProxyType({
+    # parent formatter is == object.__format__ target (~equivalent to format() built-in)
+    empty_str: "class D object",
+    # my_formatter expected results
+    "spec": "class D object formatted",
+})
+
+
+@pytest.fixture(scope="module")
+def A(module_formattable, formatmethod):
+    @module_formattable
     class A:
         """A class that has a custom formatting target decorated by simpleformatter
 
         the uncalled decorator means the default format spec, which is empty_str
 
         the target accepts only a self argument (ie, it expects no spec argument)"""
-        test_results = defaultdict(lambda: None)
-
-        # my_formatter expected results
-        test_results[empty_str] = "class A object formatted"  # no spec argument equivalent to empty_str
 
         @formatmethod  # no spec argument equivalent to empty_str
         def my_formatter(self):
@@ -47,25 +77,16 @@ def A(formattable, formatmethod):
     return A
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def ex_a(A):
     return A()
 
 
-@pytest.fixture
-def B(formattable, formatmethod):
-    @formattable
+@pytest.fixture(scope="module")
+def B(module_formattable, formatmethod):
+    @module_formattable
     class B:
         """A class that has doubly decorated custom formatting functions, different with specs"""
-        test_results = defaultdict(lambda: None)
-
-        # specialx_formatter expected results
-        test_results[empty_str] = "class B object spec = ''"
-        test_results["specialx"] = "class B object spec = 'specialx'"
-
-        # specialyz_formatter expected results
-        test_results["specialy"] = "class B object spec = 'specialyz'"
-        test_results["specialz"] = "class B object spec = 'specialyz'"
 
         @formatmethod
         @formatmethod("specialx")
@@ -83,27 +104,18 @@ def B(formattable, formatmethod):
     return B
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def ex_b(B):
     return B()
 
 
-@pytest.fixture
-def C(formattable, formatmethod):
-    @formattable
+@pytest.fixture(scope="module")
+def C(module_formattable, formatmethod):
+    @module_formattable
     class C:
         """A class that has multiple-decorated custom formatmethods
 
         for this one, the empty_str spec falls back on default __format__ functionality"""
-        test_results = defaultdict(lambda: None)
-
-        # parent formatter is == object.__format__ target (~equivalent to format() built-in)
-        test_results[""] = "class C object"
-
-        # special_formatter expected results
-        test_results["specialx"] = "class C object spec = 'specialx'"
-        test_results["specialy"] = "class C object spec = 'specialy'"
-        test_results["specialz"] = "class C object spec = 'specialz'"
 
         @formatmethod("specialx")
         @formatmethod("specialy")
@@ -118,25 +130,18 @@ def C(formattable, formatmethod):
     return C
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def ex_c(C):
     return C()
 
 
 # noinspection PyTypeChecker
-@pytest.fixture
-def D(formattable, my_formatter):
+@pytest.fixture(scope="module")
+def D(module_formattable, my_formatter):
 
-    @formattable(spec=my_formatter)
+    @module_formattable(spec=my_formatter)
     class D:
         """api decorated class, with externally defined formatting"""
-        test_results = defaultdict(lambda: None)
-
-        # parent formatter is == object.__format__ target (~equivalent to format() built-in)
-        test_results[empty_str] = "class D object"
-
-        # my_formatter expected results
-        test_results["spec"] = "class D object formatted"
 
         # the object.__format__ target just returns obj.__str__
         def __str__(self):
@@ -145,14 +150,14 @@ def D(formattable, my_formatter):
     return D
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def ex_d(D):
     return D()
 
 
-@pytest.fixture
-def E(formattable):
-    @formattable
+@pytest.fixture(scope="module")
+def E(module_formattable):
+    @module_formattable
     class E:
         """A class that assigns a custom external Formatter api object"""
         # TODO: figure out if this makes sense
@@ -161,94 +166,108 @@ def E(formattable):
     return E
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def ex_e(E):
     return E()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def my_formatter():
     def my_formatter(obj, spec):
         return f"class {type(obj).__qualname__[-1]} object formatted"
     return my_formatter
 
 
+def example(request, cls_name):
+    """Look up the example class fixture named cls_name and its example instance fixture"""
+    return request.getfixturevalue(cls_name), request.getfixturevalue(f"ex_{cls_name.lower()}")
+
+
+def example_formatter(request, cls, formatter_name):
+    """Look up a formatter by name: a "Cls.attr" class member, the builtin format, or a formatter fixture"""
+    if "." in formatter_name:
+        return attrgetter(formatter_name.partition(".")[2])(cls)
+    if formatter_name == "format":
+        return format
+    return request.getfixturevalue(formatter_name)
+
+
 # example fixture tests (does NOT test the api!!); verify formatter functions are "working" ############################
 
-@pytest.mark.parametrize("cls_name, formatter_name, spec", [
-    ("A", "A.my_formatter", empty_str),  # no argument to simpleformatter decorator == empty_str format spec
-    ("A", "A.my_formatter", "spec"),
-    ("B", "B.specialx_formatter", empty_str),  # no argument to simpleformatter decorator == empty_str format spec
-    ("B", "B.specialx_formatter", "specialx"),
-    ("B", "B.specialyz_formatter", "specialy"),
-    ("B", "B.specialyz_formatter", "specialz"),
-    ("C", "format", empty_str),  # parent formatter is == format target
-    ("C", "C.special_formatter", "specialx"),
-    ("C", "C.special_formatter", "specialy"),
-    ("C", "C.special_formatter", "specialz"),
-    ("D", "format", empty_str),  # no argument to simpleformatter decorator == empty_str format spec
-    ("D", "my_formatter", "spec"),
-], ids=[
-    "A.my_formatter empty_str", "A.my_formatter 'spec'",
-    "B.my_formatter empty_str", "B.specialx_formatter", "B.specialyz_formatter y", "B.specialyz_formatter z",
-    "C.my_formatter empty_str", "C.special_formatter x", "C.special_formatter y", "C.special_formatter z",
-    "D -> my_formatter empty_str", "D -> my_formatter 'spec'",
-])
-def test_formatter_function(cls_name, formatter_name, spec, A, ex_a, B, ex_b, C, ex_c, D, ex_d, my_formatter):
-    """Does not test the api!!!! Makes sure the formatter_name functions for test suite example classes are working"""
-
-    cls = eval(cls_name)
-    obj = eval(f"ex_{cls_name.lower()}")
-    formatter = eval(formatter_name)
+FORMATTER_FUNCTION_CASES = [
+    # no argument to simpleformatter decorator == empty_str format spec
+    pytest.param("A", "A.my_formatter", 1, empty_str, A_RESULTS[empty_str], id="A.my_formatter empty_str"),
+    # unexpected spec; my_formatter ignores it
+    pytest.param("A", "A.my_formatter", 1, "spec", None, id="A.my_formatter 'spec'"),
+    # no argument to simpleformatter decorator == empty_str format spec
+    pytest.param("B", "B.specialx_formatter", 2, empty_str, B_RESULTS[empty_str], id="B.my_formatter empty_str"),
+    pytest.param("B", "B.specialx_formatter", 2, "specialx", B_RESULTS["specialx"], id="B.specialx_formatter"),
+    pytest.param("B", "B.specialyz_formatter", 1, "specialy", B_RESULTS["specialy"], id="B.specialyz_formatter y"),
+    pytest.param("B", "B.specialyz_formatter", 1, "specialz", B_RESULTS["specialz"], id="B.specialyz_formatter z"),
+    # parent formatter is == format target
+    pytest.param("C", "format", 2, empty_str, C_RESULTS[empty_str], id="C.my_formatter empty_str"),
+    pytest.param("C", "C.special_formatter", 2, "specialx", C_RESULTS["specialx"], id="C.special_formatter x"),
+    pytest.param("C", "C.special_formatter", 2, "specialy", C_RESULTS["specialy"], id="C.special_formatter y"),
+    pytest.param("C", "C.special_formatter", 2, "specialz", C_RESULTS["specialz"], id="C.special_formatter z"),
+    # no argument to simpleformatter decorator == empty_str format spec
+    pytest.param("D", "format", 2, empty_str, D_RESULTS[empty_str], id="D -> my_formatter empty_str"),
+    pytest.param("D", "my_formatter", 2, "spec", D_RESULTS["spec"], id="D -> my_formatter 'spec'"),
+]
+
+
+@pytest.mark.parametrize("cls_name, formatter_name, nargs, spec, expected", FORMATTER_FUNCTION_CASES)
+def test_formatter_function(cls_name, formatter_name, nargs, spec, expected, request):
+    """Does not test the api!!!! Makes sure the formatter_name functions for test suite example classes are working
+
+    nargs is the number of arguments the formatter accepts: 1 for obj only, 2 for obj and spec
+    expected is None for a spec the class doesn't expect"""
+
+    cls, obj = example(request, cls_name)
+    formatter = example_formatter(request, cls, formatter_name)
     formatter_func = getattr(formatter, "__func__", formatter)
-    result = cls.test_results[spec]
-    if result is None:
+    args = (obj, spec) if nargs == 2 else (obj,)
+    if expected is None:
         # invalid spec; just make sure no exceptions get raised when formatter_name is called
-        try:
-            formatter_func(obj, spec)
-        except TypeError:
-            # single argument
-            formatter_func(obj)
+        formatter_func(*args)
     else:
-        try:
-            assert formatter_func(obj, spec) == result
-        except TypeError:
-            # single argument
-            assert formatter_func(obj) == result
+        assert formatter_func(*args) == expected
 
 
 # api tests ############################################################################################################
 
-@pytest.mark.parametrize("cls_name, spec", [
-    ("A", empty_str),  # no argument to simpleformatter decorator == empty_str format spec
-    ("A", "spec"),
-    ("B", empty_str),  # no argument to simpleformatter decorator == empty_str format spec
-    ("B", "specialx"),
-    ("B", "specialy"),
-    ("B", "specialz"),
-    ("C", empty_str),  # parent formatter is == format target
-    ("C", "specialx"),
-    ("C", "specialy"),
-    ("C", "specialz"),
-    ("D", empty_str),  # no argument to simpleformatter decorator == empty_str format spec
-    ("D", "spec"),
-], ids=[
-    "A.my_formatter empty_str", "A.my_formatter 'spec'",
-    "B.my_formatter empty_str", "B.specialx_formatter", "B.specialyz_formatter y", "B.specialyz_formatter z",
-    "C.my_formatter empty_str", "C.special_formatter x", "C.special_formatter y", "C.special_formatter z",
-    "D -> my_formatter empty_str", "D -> my_formatter 'spec'",
-])
-def test_simpleformatter_api(cls_name, spec, A, ex_a, B, ex_b, C, ex_c, D, ex_d, my_formatter):
-    """The actual api tested here"""
-
-    cls = eval(cls_name)
-    obj = eval(f"ex_{cls_name.lower()}")
-    result = cls.test_results[spec]
-    if result is None:
+API_CASES = [
+    # no argument to simpleformatter decorator == empty_str format spec
+    pytest.param("A", empty_str, A_RESULTS[empty_str], id="A.my_formatter empty_str"),
+    # unexpected spec falls back on object.__format__, which rejects it
+    pytest.param("A", "spec", TypeError, id="A.my_formatter 'spec'"),
+    # no argument to simpleformatter decorator == empty_str format spec
+    pytest.param("B", empty_str, B_RESULTS[empty_str], id="B.my_formatter empty_str"),
+    pytest.param("B", "specialx", B_RESULTS["specialx"], id="B.specialx_formatter"),
+    pytest.param("B", "specialy", B_RESULTS["specialy"], id="B.specialyz_formatter y"),
+    pytest.param("B", "specialz", B_RESULTS["specialz"], id="B.specialyz_formatter z"),
+    # parent formatter is == format target
+    pytest.param("C", empty_str, C_RESULTS[empty_str], id="C.my_formatter empty_str"),
+    pytest.param("C", "specialx", C_RESULTS["specialx"], id="C.special_formatter x"),
+    pytest.param("C", "specialy", C_RESULTS["specialy"], id="C.special_formatter y"),
+    pytest.param("C", "specialz", C_RESULTS["specialz"], id="C.special_formatter z"),
+    # no argument to simpleformatter decorator == empty_str format spec
+    pytest.param("D", empty_str, D_RESULTS[empty_str], id="D -> my_formatter empty_str"),
+    pytest.param("D", "spec", D_RESULTS["spec"], id="D -> my_formatter 'spec'"),
+]
+
+
+@pytest.mark.parametrize("cls_name, spec, expected", API_CASES)
+def test_simpleformatter_api(cls_name, spec, expected, request):
+    """The actual api tested here
+
+    expected is either the formatted string or the exception type formatting should raise"""
+
+    obj = request.getfixturevalue(f"ex_{cls_name.lower()}")
+    if expected is TypeError:
         with pytest.raises(TypeError):
-            f"{obj:{spec!s}}"
+            format(obj, spec)
     else:
-        assert f"{obj:{spec!s}}" == result
+        assert format(obj, spec) == expected
 
 
 def test_ambiguous_no_spec_and_inheritance(formattable, formatmethod):
@@ -307,6 +326,23 @@ def test_ambiguous_competing(formattable, formatmethod):
     assert f"{X():spec}" == X().b()
 
 
+def test_ambiguous_definition_order(formattable, formatmethod):
+    """last defined spec wins with two competing functions, even when it isn't last alphabetically"""
+
+    @formattable
+    class X:
+
+        @formatmethod("spec")
+        def b(self):
+            return "b"
+
+        @formatmethod("spec")
+        def a(self):
+            return "a"
+
+    assert f"{X():spec}" == X().a()
+
+
 def test_ambiguous_special(formattable, formatmethod):
     """last defined spec wins with two competing functions, one with no spec and one with empty_str spec"""
 
@@ -322,3 +358,64 @@ def test_ambiguous_special(formattable, formatmethod):
             return "b"
 
     assert f"{X()}" == X().b()
+
+
+def test_shadowed_formatmethod(formattable, formatmethod):
+    """a subclass member that isn't a formatmethod hides the parent formatmethod of the same name"""
+
+    @formattable
+    class X:
+
+        @formatmethod("spec")
+        def a(self):
+            return "a"
+
+        @formatmethod("spec")
+        def b(self):
+            return "b"
+
+    @formattable
+    class Y(X):
+
+        def b(self):
+            return "not a formatmethod"
+
+    assert f"{X():spec}" == "b"
+    assert f"{Y():spec}" == "a"
+
+
+def test_formatmethod_added_later(formattable, formatmethod):
+    """formatmethods added to a class after it was formatted are used once the lookup caches are cleared"""
+
+    @formattable
+    class X:
+        def __str__(self):
+            return "X"
+
+    assert f"{X()}" == "X"
+
+    X.m = formatmethod(lambda self: "m")
+    clear_caches()
+
+    assert f"{X()}" == "m"
+
+
+def test_subclass_own__format__(formattable):
+    """a formattable subclass falls back on the parent's original __format__, including when its own delegates to it"""
+
+    @formattable
+    class X:
+        def __format__(self, format_spec):
+            return "X default"
+
+    @formattable
+    class Y(X):
+        def __format__(self, format_spec):
+            return "Y:" + super().__format__(format_spec)
+
+    @formattable
+    class Z(X): ...
+
+    assert f"{X()}" == "X default"
+    assert f"{Y()}" == "X default"
+    assert f"{Z()}" == "X default"
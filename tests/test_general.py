@@ -3,10 +3,15 @@
 
 """Tests for `simpleformatter.target` decorator usage."""
 
-from collections import defaultdict
+from types import MappingProxyType
 
 import pytest
 
+A_RESULTS = MappingProxyType({
+    "spec1": "class A object with univ spec #1 = 'spec1'",
+    "spec2": "class A object with univ spec #2 = 'spec2'",
+})
+
 
 @pytest.fixture
 def gen_fmtr_func1():
@@ -25,9 +30,7 @@ def gen_fmtr_func2():
 @pytest.fixture
 def A():
     class A:
-        test_results = defaultdict(lambda: None)
-        test_results.update(spec1="class A object with univ spec #1 = 'spec1'",
-                            spec2="class A object with univ spec #2 = 'spec2'", ),
+        test_results = A_RESULTS
 
         def __str__(self):
             return "class A object"
@@ -65,8 +68,8 @@ def formatters_last(target, a_first, gen_fmtr_func1, gen_fmtr_func2):
     "spec2",
 ])
 def test_class_first(a_first, formatters_last, spec):
-    expected = a_first.test_results[spec]
-    actual = f"{a_first:{spec!s}}"
+    expected = a_first.test_results.get(spec)
+    actual = format(a_first, spec)
     assert actual == expected
 
 
@@ -75,13 +78,12 @@ def test_class_first(a_first, formatters_last, spec):
     "spec2",
 ])
 def test_formatters_first(a_last, formatters_first, spec):
-    f"{a_last:{''}}"
-    assert f"{a_last:{spec!s}}" == a_last.test_results[spec]
+    assert format(a_last, spec) == a_last.test_results.get(spec)
 
 
 @pytest.mark.parametrize("bad_arg", [
-    None, 1, object(),
-], ids= ("NoneType", "int", "object()"))
+    pytest.param(None, id="NoneType"), pytest.param(1, id="int"), pytest.param(object(), id="object()"),
+])
 def test_str_only_spec(bad_arg, target, formatmethod, formattable):
     """format specs must be strings (might change this requirement later...?)"""
 
@@ -109,3 +111,20 @@ def test_not_type(formattable):
 
     with pytest.raises(TypeError):
         formattable(int)
+
+
+def test_target_added_after_format(target, formattable):
+    """registering a target after a formattable object has already been formatted takes effect"""
+
+    @formattable
+    class X:
+        def __str__(self):
+            return "X"
+
+    assert f"{X()}" == "X"
+
+    @target("")
+    def f(obj):
+        return "f"
+
+    assert f"{X()}" == "f"
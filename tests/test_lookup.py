@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the formatting lookup helpers and caches of `simpleformatter`, and for `simpleformatter.format_many`."""
+
+import gc
+import weakref
+
+import pytest
+from simpleformatter import format_many
+from simpleformatter.simpleformatter import (SimpleFormatterError, compute_formatting_func, compute_target,
+                                             lookup_formatmethod, target_arity)
+
+
+def test_target_arity(target, formattable):
+    """targets may discard the obj and spec arguments"""
+
+    @target("no_args")
+    def f0():
+        return "f0"
+
+    @target("var_args")
+    def f_var(*args):
+        return f"f_var{len(args)}"
+
+    @formattable
+    class X: ...
+
+    assert target_arity(f0) == 0
+    assert f"{X():no_args}" == "f0"
+    assert target_arity(f_var) == 1
+    assert f"{X():var_args}" == "f_var1"
+
+
+def test_lookup_defaults(formattable):
+    """lookup helpers return a given default for unhandled specs instead of raising"""
+
+    @formattable
+    class X: ...
+
+    assert compute_target(X(), "unhandled", None) is None
+    assert lookup_formatmethod(X(), "unhandled", None) is None
+    assert compute_formatting_func(X(), "unhandled", None) is None
+    with pytest.raises(SimpleFormatterError):
+        compute_target(X(), "unhandled")
+    with pytest.raises(SimpleFormatterError):
+        lookup_formatmethod(X(), "unhandled")
+    with pytest.raises(SimpleFormatterError):
+        compute_formatting_func(X(), "unhandled")
+
+
+def test_formatted_class_not_kept_alive(formattable):
+    """the lookup caches don't keep a formatted class alive"""
+
+    @formattable
+    class X:
+        def __str__(self):
+            return "X"
+
+    class Y(X): ...
+
+    assert f"{Y()}" == "X"
+
+    y_ref = weakref.ref(Y)
+    del Y
+    gc.collect()
+    assert y_ref() is None
+
+
+def test_format_many(target, formattable):
+    """format_many gives the same results as format for each object, including mixed types"""
+
+    @target("many")
+    def f(obj):
+        return type(obj).__name__
+
+    @formattable
+    class X: ...
+
+    @formattable
+    class Y: ...
+
+    objs = [X(), X(), Y(), X()]
+    assert format_many(objs, "many") == [format(obj, "many") for obj in objs] == ["X", "X", "Y", "X"]
+    assert format_many([1, 2.5], ".1f") == ["1.0", "2.5"]
+    with pytest.raises(TypeError):
+        format_many(objs, 1)
+
+
+def test_format_many_non_str(target, formattable):
+    """format_many rejects a formatting result that isn't a str, as format does"""
+
+    @target("int")
+    def f(obj):
+        return 5
+
+    @formattable
+    class X: ...
+
+    with pytest.raises(TypeError):
+        format(X(), "int")
+    with pytest.raises(TypeError):
+        format_many([X()], "int")
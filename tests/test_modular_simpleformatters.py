@@ -2,28 +2,34 @@
 # -*- coding: utf-8 -*-
 
 """Tests for multiple, concurrent instances of the `SimpleFormatter` class."""
+from copy import deepcopy
+
 import pytest
 from simpleformatter import SimpleFormatter
+from simpleformatter.simpleformatter import SimpleFormatterError
+
+# NOTE: sf1, sf2 and the objects and targets registered with them are shared by the whole module, so tests using them
+# must only format; tests that register or freeze create their own SimpleFormatter instances
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sf1():
     return SimpleFormatter()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sf2():
     return SimpleFormatter()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def obj1(sf1):
     @sf1.formattable
     class Obj1: ...
     return Obj1()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def func1(sf1):
     @sf1.target("", "spec")
     def f1(obj):
@@ -31,14 +37,14 @@ def func1(sf1):
     return f1
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def obj2(sf2):
     @sf2.formattable
     class Obj2: ...
     return Obj2()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def func2(sf2):
     @sf2.target("", "spec")
     def f2(obj):
@@ -47,16 +53,17 @@ def func2(sf2):
 
 
 @pytest.mark.parametrize("spec", [
-    "spec", "",
-], ids= ["spec", "empty_str"])
+    pytest.param("spec", id="spec"), pytest.param("", id="empty_str"),
+])
 def test_modular_functions(spec, obj1, func1, obj2, func2):
     """make sure sf1 and sf2 format things independently of each other"""
-    assert f"{obj1:{spec}}" == "f1"
-    assert f"{obj2:{spec}}" == "f2"
+    assert format(obj1, spec) == "f1"
+    assert format(obj2, spec) == "f2"
 
 
-def test_modular_methods(sf1, sf2, formatmethod):
+def test_modular_methods(formatmethod):
     """make sure using sf1 and sf2 on the same class also works"""
+    sf1, sf2 = SimpleFormatter(), SimpleFormatter()
 
     @sf1.target("spec1")
     def f1(obj):
@@ -77,3 +84,88 @@ def test_modular_methods(sf1, sf2, formatmethod):
 
     assert f"{x:spec1}"=="f1"
     assert f"{x:spec2}"=="f2"
+
+
+def test_frozen():
+    """a frozen SimpleFormatter keeps formatting but refuses new registrations"""
+    sf = SimpleFormatter()
+
+    @sf.target("spec")
+    def f(obj):
+        return "f"
+
+    @sf.formattable
+    class X: ...
+
+    sf.freeze()
+
+    assert f"{X():spec}" == "f"
+    with pytest.raises(TypeError):
+        sf.target_reg["new"] = f
+    with pytest.raises(SimpleFormatterError):
+        sf.target("new")(f)
+    with pytest.raises(SimpleFormatterError):
+        @sf.formattable
+        class Y: ...
+
+
+def test_deepcopy_frozen():
+    """a deep copy of a frozen SimpleFormatter formats the same way and is frozen too"""
+    sf = SimpleFormatter()
+
+    @sf.target("spec")
+    def f(obj):
+        return "f"
+
+    @sf.formattable(other=f)
+    class X: ...
+
+    sf.freeze()
+    sf_copy = deepcopy(sf)
+
+    assert sf_copy.frozen
+    assert sf_copy.target_reg == {"spec": f}
+    assert sf_copy.cls_reg == {X: {"other": f}}
+    with pytest.raises(TypeError):
+        sf_copy.target_reg["new"] = f
+    with pytest.raises(SimpleFormatterError):
+        sf_copy.target("new")(f)
+
+
+def test_subclass_formatters():
+    """registering a subclass with another SimpleFormatter doesn't attach it to the parent class"""
+    sf1, sf2 = SimpleFormatter(), SimpleFormatter()
+
+    @sf2.target("spec2")
+    def f2(obj):
+        return "f2"
+
+    @sf1.formattable
+    class X: ...
+
+    @sf2.formattable
+    class Y(X): ...
+
+    assert f"{Y():spec2}" == "f2"
+    with pytest.raises(TypeError):
+        f"{X():spec2}"
+
+
+def test_parent_formatters_added_later():
+    """a SimpleFormatter registered with a parent after a subclass was decorated still reaches the subclass"""
+    sf1, sf2, sf3 = SimpleFormatter(), SimpleFormatter(), SimpleFormatter()
+
+    @sf3.target("spec3")
+    def f3(obj):
+        return "f3"
+
+    @sf1.formattable
+    class X: ...
+
+    @sf2.formattable
+    class Y(X): ...
+
+    sf3.formattable(X)
+
+    assert format(Y(), "spec3") == "f3"
+    assert format(X(), "spec3") == "f3"